@@ -1,13 +1,94 @@
+import json
+
 import streamlit as st
 import pandas as pd
 
-# --- IMPORT BACKENDS ---
-try:
-    import surfacelaid_psi_backend as surface_backend
-    from trenched_psi_backend import Trenched_PSI_Backend
-except ImportError as e:
-    st.error(f"Error importing backend files: {e}. Please check your filenames in GitHub.")
-    st.stop()
+# --- IMPORT BACKENDS (lazily, once per process) ---
+@st.cache_resource(show_spinner=False)
+def _get_surface_backend():
+    import surfacelaid_psi_backend
+    return surfacelaid_psi_backend
+
+@st.cache_resource(show_spinner=False)
+def _get_trenched_backend():
+    import trenched_psi_backend
+    return trenched_psi_backend
+
+def _load_backend(loader):
+    try:
+        return loader()
+    except ImportError as e:
+        st.error(f"Error importing backend files: {e}. Please check your filenames in GitHub.")
+        st.stop()
+
+# --- CACHED BACKEND CALLS ---
+@st.cache_data(show_spinner=False)
+def _cached_surface(inputs_tuple):
+    return _get_surface_backend().run_psi_analysis(dict(inputs_tuple))
+
+@st.cache_data(show_spinner=False)
+def _cached_trenched(dop, tp, h_trench, soil_inputs_frozen):
+    soil_inputs = {k: list(v) for k, v in soil_inputs_frozen}
+    return _get_trenched_backend().Trenched_PSI_Backend(dop, tp, h_trench).run_analysis(soil_inputs)
+
+# --- RESULT TABLES ---
+@st.cache_data(show_spinner=False)
+def build_surface_tables(profiles_json: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Flattens the backend profiles into the Concrete and PET display tables."""
+    rows = {"Concrete": [], "PET": []}
+    for p in json.loads(profiles_json):
+        rows[p["Surface"]].append({
+            "Estimate": p["Estimate"],
+            "Axial Brk (kN/m)": p["Axial"]["BreakForce"],
+            "Xbrk (mm)": p["Axial"]["BreakDisp"],
+            "Axial Res (kN/m)": p["Axial"]["ResForce"],
+            "Xres (mm)": p["Axial"]["ResDisp"],
+            "Lat Brk (kN/m)": p["Lateral"]["BreakForce"],
+            "Ybrk (mm)": p["Lateral"]["BreakDisp"],
+            "Lat Res (kN/m)": p["Lateral"]["ResForce"],
+            "Yres (mm)": p["Lateral"]["ResDisp"]
+        })
+
+    return pd.DataFrame(rows["Concrete"]), pd.DataFrame(rows["PET"])
+
+# --- RESULT RENDERING ---
+@st.fragment
+def render_surface_results(results):
+    metrics = results["metrics"]
+
+    # --- RESULTS ---
+    st.divider()
+    st.subheader("Calculation Summary")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Effective Force (V)", f"{metrics['V']:.3f} kN/m")
+    col2.metric("Vertical Capacity (Qv)", f"{metrics['Qv']:.3f} kN/m")
+    col3.metric("Wedging Factor (ζ)", f"{metrics['zeta']:.3f}")
+    col4.metric("Lateral Passive Resist.", f"{metrics['Fl_remain']:.3f} kN/m")
+
+    if metrics['V'] > metrics['Qv']:
+        st.error("FAILURE WARNING: Effective Force (V) > Vertical Capacity (Qv). The pipe is likely to sink.")
+    else:
+        st.success("STABILITY OK: Effective Force (V) < Vertical Capacity (Qv).")
+
+    # --- DATA TABLES ---
+    st.subheader("Detailed Resistance Values")
+    df_conc, df_pet = build_surface_tables(json.dumps(results["profiles"], sort_keys=True))
+    c1, c2 = st.tabs(["Concrete Table", "PET Table"])
+    with c1:
+        st.dataframe(df_conc, use_container_width=True)
+    with c2:
+        st.dataframe(df_pet, use_container_width=True)
+
+@st.fragment
+def render_trenched_results(v_eff, df_results):
+    # --- OUTPUTS ---
+    st.divider()
+    st.metric("Effective Vertical Force (V)", f"{v_eff:.2f} kN/m")
+    
+    # Display Table
+    st.subheader("Resistance Summary")
+    df_display = df_results.set_index("Category").T
+    st.dataframe(df_display, use_container_width=True)
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Unified PSI Tool", layout="wide")
@@ -28,166 +109,120 @@ st.sidebar.markdown("---")
 # MODE 1: SURFACE LAID ANALYSIS
 # =========================================================
 if analysis_mode == "Surface Laid Pipeline":
+    _load_backend(_get_surface_backend)
     st.subheader("Surface Laid Analysis (Undrained)")
     st.info("Calculates Vertical, Axial, and Lateral resistance profiles for exposed/partially embedded pipes.")
 
-    # --- SIDEBAR INPUTS ---
-    st.sidebar.header("1. Pipeline Geometry")
-    Dop = st.sidebar.number_input("Outer Diameter (m)", value=0.3239, format="%.4f")
-    tp = st.sidebar.number_input("Wall Thickness (m)", value=0.0127, format="%.4f")
-    Z = st.sidebar.number_input("Embedment Depth Z (m)", value=0.05, format="%.3f")
+    # --- SIDEBAR INPUTS (batched into one rerun per submit) ---
+    with st.sidebar.form("surface_inputs"):
+        st.header("1. Pipeline Geometry")
+        Dop = st.number_input("Outer Diameter (m)", value=0.3239, format="%.4f")
+        tp = st.number_input("Wall Thickness (m)", value=0.0127, format="%.4f")
+        Z = st.number_input("Embedment Depth Z (m)", value=0.05, format="%.3f")
     
-    st.sidebar.header("2. Soil Properties")
-    Su = st.sidebar.number_input("Shear Strength Su (kPa)", value=5.0)
-    OCR = st.sidebar.number_input("OCR", value=1.0)
-    St = st.sidebar.number_input("Sensitivity St", value=3.0)
-    Su_passive = st.sidebar.number_input("Passive Su (kPa)", value=5.0)
-    gamma_bulk = st.sidebar.number_input("Bulk Unit Weight (kN/m³)", value=16.0)
+        st.header("2. Soil Properties")
+        Su = st.number_input("Shear Strength Su (kPa)", value=5.0)
+        OCR = st.number_input("OCR", value=1.0)
+        St = st.number_input("Sensitivity St", value=3.0)
+        Su_passive = st.number_input("Passive Su (kPa)", value=5.0)
+        gamma_bulk = st.number_input("Bulk Unit Weight (kN/m³)", value=16.0)
     
-    st.sidebar.header("3. Interaction Factors")
-    alpha = st.sidebar.number_input("Adhesion Factor α", value=0.5)
-    rate = st.sidebar.number_input("Rate Factor", value=1.0)
+        st.header("3. Interaction Factors")
+        alpha = st.number_input("Adhesion Factor α", value=0.5)
+        rate = st.number_input("Rate Factor", value=1.0)
     
-    # Dynamic Input Generator for Surfaces
-    def get_surface_params(surface_name):
-        st.sidebar.subheader(f"{surface_name} Surface Settings")
-        c1, c2 = st.sidebar.columns(2)
-        p5_ssr = c1.number_input(f"{surface_name} P5 SSR", value=0.25)
-        p5_prem = c2.number_input(f"{surface_name} P5 Prem", value=1.0)
-        
-        p50_ssr = c1.number_input(f"{surface_name} P50 SSR", value=0.35)
-        p50_prem = c2.number_input(f"{surface_name} P50 Prem", value=1.0)
-        
-        p95_ssr = c1.number_input(f"{surface_name} P95 SSR", value=0.45)
-        p95_prem = c2.number_input(f"{surface_name} P95 Prem", value=1.0)
+        # Dynamic Input Generator for Surfaces
+        def get_surface_params(surface_name):
+            st.subheader(f"{surface_name} Surface Settings")
+            c1, c2 = st.columns(2)
+            keys = []
+            for est, ssr_default in (("P5", 0.25), ("P50", 0.35), ("P95", 0.45)):
+                ssr_key, prem_key = f"{surface_name}_{est}_SSR", f"{surface_name}_{est}_Prem"
+                c1.number_input(f"{est} SSR", value=ssr_default, key=ssr_key)
+                c2.number_input(f"{est} Prem", value=1.0, key=prem_key)
+                keys += [ssr_key, prem_key]
+
+            return {k: st.session_state[k] for k in keys}
         
-        return {
-            f"{surface_name}_P5_SSR": p5_ssr, f"{surface_name}_P5_Prem": p5_prem,
-            f"{surface_name}_P50_SSR": p50_ssr, f"{surface_name}_P50_Prem": p50_prem,
-            f"{surface_name}_P95_SSR": p95_ssr, f"{surface_name}_P95_Prem": p95_prem,
-        }
-        
-    conc_data = get_surface_params("Concrete")
-    pet_data = get_surface_params("PET")
+        conc_data = get_surface_params("Concrete")
+        pet_data = get_surface_params("PET")
+
+        submitted = st.form_submit_button("Run Surface Analysis", type="primary")
+
+    # Prepare inputs dictionary
+    geom_dict = {'Dop': Dop, 'tp': tp, 'Z': Z}
+    soil_dict = {'Su': Su, 'OCR': OCR, 'St': St, 'gamma_bulk': gamma_bulk, 'Su_passive': Su_passive}
+    interaction_dict = {'alpha': alpha, 'rate': rate}
+    inputs = {**geom_dict, **soil_dict, **interaction_dict, **conc_data, **pet_data}
+    key = tuple(sorted(inputs.items()))
 
     # --- EXECUTE ---
-    if st.button("Run Surface Analysis", type="primary"):
-        # Prepare inputs dictionary
-        inputs = {
-            'Dop': Dop, 'tp': tp, 'Z': Z, 'Su': Su, 'OCR': OCR, 'St': St,
-            'alpha': alpha, 'rate': rate, 'gamma_bulk': gamma_bulk, 'Su_passive': Su_passive
-        }
-        inputs.update(conc_data)
-        inputs.update(pet_data)
-
-        # Call Backend
-        results = surface_backend.run_psi_analysis(inputs)
-        metrics = results["metrics"]
-
-        # --- RESULTS ---
-        st.divider()
-        st.subheader("Calculation Summary")
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Effective Force (V)", f"{metrics['V']:.3f} kN/m")
-        col2.metric("Vertical Capacity (Qv)", f"{metrics['Qv']:.3f} kN/m")
-        col3.metric("Wedging Factor (ζ)", f"{metrics['zeta']:.3f}")
-        col4.metric("Lateral Passive Resist.", f"{metrics['Fl_remain']:.3f} kN/m")
-
-        if metrics['V'] > metrics['Qv']:
-            st.error("FAILURE WARNING: Effective Force (V) > Vertical Capacity (Qv). The pipe is likely to sink.")
-        else:
-            st.success("STABILITY OK: Effective Force (V) < Vertical Capacity (Qv).")
-
-        # --- DATA TABLES ---
-        st.subheader("Detailed Resistance Values")
-        table_data = []
-        for p in results["profiles"]:
-            table_data.append({
-                "Surface": p["Surface"],
-                "Estimate": p["Estimate"],
-                "Axial Brk (kN/m)": p["Axial"]["BreakForce"],
-                "Xbrk (mm)": p["Axial"]["BreakDisp"],
-                "Axial Res (kN/m)": p["Axial"]["ResForce"],
-                "Xres (mm)": p["Axial"]["ResDisp"],
-                "Lat Brk (kN/m)": p["Lateral"]["BreakForce"],
-                "Ybrk (mm)": p["Lateral"]["BreakDisp"],
-                "Lat Res (kN/m)": p["Lateral"]["ResForce"],
-                "Yres (mm)": p["Lateral"]["ResDisp"]
-            })
-        
-        df_results = pd.DataFrame(table_data)
-        c1, c2 = st.tabs(["Concrete Table", "PET Table"])
-        with c1:
-            st.dataframe(df_results[df_results["Surface"] == "Concrete"].drop(columns=["Surface"]), use_container_width=True)
-        with c2:
-            st.dataframe(df_results[df_results["Surface"] == "PET"].drop(columns=["Surface"]), use_container_width=True)
+    if submitted:
+        # Call Backend (memoized on the frozen inputs)
+        st.session_state["surface_results"] = (key, _cached_surface(key))
+
+    # Only show results produced by the inputs currently on screen
+    stored = st.session_state.get("surface_results")
+    if stored is not None and stored[0] == key:
+        render_surface_results(stored[1])
 
 # =========================================================
 # MODE 2: TRENCHED ANALYSIS
 # =========================================================
 elif analysis_mode == "Trenched Pipeline":
+    _load_backend(_get_trenched_backend)
     st.subheader("Trenched Pipeline Analysis")
     st.info("Calculates Axial and Uplift resistance for buried pipes.")
 
-    # --- SIDEBAR INPUTS ---
-    st.sidebar.header("1. Trenched Geometry")
-    dop = st.sidebar.number_input("Outer Diameter (Dop) [m]", value=0.40, format="%.3f", key="t_dop")
-    tp = st.sidebar.number_input("Wall Thickness (tp) [m]", value=0.015, format="%.3f", key="t_tp")
-    h_trench = st.sidebar.number_input("Trench Height (H) [m]", value=1.00, format="%.2f", key="t_h")
-
-    # Soil Inputs in Main Window
-    st.subheader("2. Soil Parameters (P5 / P50 / P95)")
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("**P5 (Low)**")
-        alpha_p5 = st.number_input("Alpha", value=0.5, key="a_p5")
-        gbulk_p5 = st.number_input("Gamma Bulk", value=16.0, key="g_p5")
-        sbnb_p5 = st.number_input("Su Backfill Non-Brittle", value=2.0, key="sbnb_p5")
-        sbo_p5 = st.number_input("Su Breakout", value=3.0, key="sbo_p5")
-        sba_p5 = st.number_input("Su Backfill Axial", value=2.5, key="sba_p5")
-
-    with col2:
-        st.markdown("**P50 (Best)**")
-        alpha_p50 = st.number_input("Alpha", value=0.6, key="a_p50")
-        gbulk_p50 = st.number_input("Gamma Bulk", value=17.0, key="g_p50")
-        sbnb_p50 = st.number_input("Su Backfill Non-Brittle", value=3.0, key="sbnb_p50")
-        sbo_p50 = st.number_input("Su Breakout", value=4.0, key="sbo_p50")
-        sba_p50 = st.number_input("Su Backfill Axial", value=3.5, key="sba_p50")
-
-    with col3:
-        st.markdown("**P95 (High)**")
-        alpha_p95 = st.number_input("Alpha", value=0.8, key="a_p95")
-        gbulk_p95 = st.number_input("Gamma Bulk", value=18.0, key="g_p95")
-        sbnb_p95 = st.number_input("Su Backfill Non-Brittle", value=5.0, key="sbnb_p95")
-        sbo_p95 = st.number_input("Su Breakout", value=6.0, key="sbo_p95")
-        sba_p95 = st.number_input("Su Backfill Axial", value=5.0, key="sba_p95")
-
-    # Consolidate inputs
-    soil_inputs = {
-        'alpha': [alpha_p5, alpha_p50, alpha_p95],
-        'g_bulk': [gbulk_p5, gbulk_p50, gbulk_p95],
-        's_bnb': [sbnb_p5, sbnb_p50, sbnb_p95],
-        's_bo': [sbo_p5, sbo_p50, sbo_p95],
-        's_ba': [sba_p5, sba_p50, sba_p95]
-    }
+    # --- INPUTS (geometry and soil batched into one rerun per submit) ---
+    with st.form("trenched_inputs"):
+        st.subheader("1. Trenched Geometry")
+        g1, g2, g3 = st.columns(3)
+        dop = g1.number_input("Outer Diameter (Dop) [m]", value=0.40, format="%.3f", key="t_dop")
+        tp = g2.number_input("Wall Thickness (tp) [m]", value=0.015, format="%.3f", key="t_tp")
+        h_trench = g3.number_input("Trench Height (H) [m]", value=1.00, format="%.2f", key="t_h")
+
+        # Soil Inputs in Main Window (one editable grid: parameter x estimate case)
+        st.subheader("2. Soil Parameters (P5 / P50 / P95)")
+        soil_rows = {
+            "Alpha": 'alpha',
+            "Gamma Bulk": 'g_bulk',
+            "Su Backfill Non-Brittle": 's_bnb',
+            "Su Breakout": 's_bo',
+            "Su Backfill Axial": 's_ba'
+        }
+        soil_defaults = pd.DataFrame(
+            {
+                "P5 (Low)": [0.5, 16.0, 2.0, 3.0, 2.5],
+                "P50 (Best)": [0.6, 17.0, 3.0, 4.0, 3.5],
+                "P95 (High)": [0.8, 18.0, 5.0, 6.0, 5.0]
+            },
+            index=list(soil_rows)
+        )
+        soil_grid = st.data_editor(
+            soil_defaults, key="soil_grid", use_container_width=True, num_rows="fixed",
+            column_config={c: st.column_config.NumberColumn(required=True) for c in soil_defaults.columns}
+        )
+
+        # Consolidate inputs
+        soil_inputs = {key: soil_grid.loc[label].tolist() for label, key in soil_rows.items()}
+
+        submitted = st.form_submit_button("Run Trenched Analysis", type="primary")
+
+    soil_inputs_frozen = tuple((k, tuple(v)) for k, v in sorted(soil_inputs.items()))
+    key = (dop, tp, h_trench, soil_inputs_frozen)
 
     # --- EXECUTE ---
-    if st.button("Run Trenched Analysis", type="primary"):
-        # Initialize Backend
-        model = Trenched_PSI_Backend(dop, tp, h_trench)
-        
-        # Run Calculation
-        v_eff, df_results = model.run_analysis(soil_inputs)
-        
-        # --- OUTPUTS ---
-        st.divider()
-        st.metric("Effective Vertical Force (V)", f"{v_eff:.2f} kN/m")
-        
-        # Display Table
-        st.subheader("Resistance Summary")
-        df_display = df_results.set_index("Category").T
-        st.dataframe(df_display, use_container_width=True)
+    if submitted and soil_grid.isna().to_numpy().any():
+        st.error("Please fill in every soil parameter before running the analysis.")
+    elif submitted:
+        # Run Calculation (memoized on geometry + frozen soil inputs)
+        st.session_state["trenched_results"] = (key, _cached_trenched(*key))
+
+    # Only show results produced by the inputs currently on screen
+    stored = st.session_state.get("trenched_results")
+    if stored is not None and stored[0] == key:
+        render_trenched_results(*stored[1])
 
 # --- FOOTER ---
 st.markdown("---")
@@ -0,0 +1,44 @@
+from math import pi
+from functools import lru_cache
+
+@lru_cache(maxsize=128)
+def pipe_weights(dop, tp, g_steel=7850, g_fluid=1000, g_sw=1025, g_acc=9.8):
+    """
+    Pipe weight terms shared by the surface-laid and trenched backends.
+    Pure in geometry and densities, so memoized: re-runs that only change
+    soil parameters reuse the previous result.
+
+    Args:
+        dop (float): Outer Diameter (m)
+        tp (float): Wall Thickness (m)
+        g_steel, g_fluid, g_sw (float): Steel, content and seawater densities (kg/m³)
+        g_acc (float): Gravitational acceleration (m/s²)
+
+    Returns:
+        tuple: (dip, ap, wp, wpf, wpins) -- wp is the steel mass in kg/m,
+               wpf and wpins are the flooded and installation weights in kN/m
+    """
+    dip = dop - (2 * tp)
+    
+    # Section areas, reused by every weight term below
+    ap = (pi * dop * dop) / 4          # Outer area (also used in uplift)
+    a_bore = (pi * dip * dip) / 4      # Bore area
+    a_steel = ap - a_bore              # Steel annulus
+    
+    # Weight Calculations
+    # Wp: Steel weight
+    wp = a_steel * g_steel
+    
+    # Wcon: Fluid content weight
+    wcon = a_bore * g_fluid
+    
+    # Wb: Buoyancy
+    wb = ap * g_sw
+    
+    # Wpf: Flooded weight in kN/m
+    wpf = ((wp + wcon - wb) * g_acc) / 1000
+    
+    # Wpins: Installation weight (Steel - Seawater)
+    wpins = (a_steel * (g_steel - g_sw)) * g_acc / 1000
+    
+    return dip, ap, wp, wpf, wpins
@@ -1,143 +1,164 @@
 import numpy as np
 
-def run_psi_analysis(inputs):
+from psi_core import pipe_weights
+
+SURFACES = ["Concrete", "PET"]
+ESTIMATES = ["P5", "P50", "P95"]
+
+# [cite_start]Per-estimate coefficients, indexed P5 / P50 / P95 [cite: 68, 69, 70, 71, 72]
+LRES_MULT = np.array([1.0 / 1.5, 1.0, 1.5])   # Safety factor on residual lateral resistance
+XB_CAP = np.array([1.25, 5.0, 50.0])           # Axial breakout displacement cap (mm)
+XB_COEF = np.array([0.0025, 0.01, 0.01])       # Axial breakout displacement / Dop
+XR_CAP = np.array([7.5, 30.0, 250.0])          # Axial residual displacement cap (mm)
+XR_COEF = np.array([0.015, 0.06, 0.5])         # Axial residual displacement / Dop
+CAP_IS_FLOOR = np.array([False, False, True])  # P95 caps are lower bounds, P5/P50 upper bounds
+YB_BASE = np.array([0.004, 0.02, 0.1])         # Lateral breakout displacement: base + slope * Z/Dop
+YB_SLOPE = np.array([0.02, 0.25, 0.7])
+YR_COEF = np.array([0.6, 1.5, 2.8])            # Lateral residual displacement / Dop
+
+def _geometry_kernel(Dop, Z, Su, Sub_wt, rate, Su_passive):
     """
-    Performs Undrained Pipe-Soil Interaction analysis.
-    Calculates Axial and Lateral resistance profiles for given soil and pipe parameters.
+    Penetrated area, vertical capacity, wedging factor and passive lateral resistance.
+    Inputs may be floats or broadcastable arrays; returns (Abm, Qv, zeta, Fl_remain)
+    with the broadcast shape (NumPy scalars for scalar inputs).
+    """
+    Dop, Z, Su, Sub_wt, rate, Su_passive = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (Dop, Z, Su, Sub_wt, rate, Su_passive))
+    )
+
+    # Both sides of each branch are evaluated, the unused side may divide by zero
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zd = Z / Dop
+
+        # Wedging angle beta, shared by the penetrated area and zeta: cos(beta) = 1 - 2Z/Dop.
+        # Written via the half angle (sin(beta/2)^2 = Z/Dop) so shallow embedments keep precision.
+        zd_c = np.clip(zd, 0.0, 1.0) # Safety clamp (cos(beta) in [-1, 1])
+        cosVal = 1 - 2 * zd_c
+        sin_beta = 2 * np.sqrt(zd_c * (1 - zd_c))
+        beta = 2 * np.arcsin(np.sqrt(zd_c))
+
+        # [cite_start]--- 3. GEOMETRY & VERTICAL RESISTANCE (Qv) [cite: 60, 61] ---
+        # Logic for Penetrated Area (Abm)
+        # Partial embedment: chord B = Dop*sin(beta), so asin(B/Dop) = beta and cos(asin(B/Dop)) = cosVal
+        B = Dop * sin_beta
+        Abm_partial = np.where(Dop > 0, (beta * (Dop**2 / 4)) - (B * (Dop / 4) * cosVal), 0.0)
+        Abm_full = (np.pi * Dop**2 / 8) + Dop * (Z - Dop / 2)
+        Abm = np.where(Z < Dop / 2, Abm_partial, Abm_full)
+
+        # [cite_start]Vertical Bearing Capacity Qv [cite: 61, 62]
+        term1 = 6 * zd**0.25
+        term2 = 3.4 * np.sqrt(10 * zd)
+        Qv = np.where(Dop > 0, (np.minimum(term1, term2) + (1.5 * Sub_wt * Abm / (Dop * Su))) * Dop * Su, 0.0)
+
+        # [cite_start]--- 4. WEDGING & LATERAL RESISTANCE [cite: 62, 63] ---
+        # Wedging Factor (zeta)
+        denom = beta + sin_beta * cosVal
+        zeta = np.where(denom != 0, (2 * sin_beta) / denom, 1.0)
+
+    # [cite_start]Lateral Remaining Resistance (Passive Soil) [cite: 63]
+    Fl_remain = Z * rate * (2 * Su_passive + 0.5 * Sub_wt * Z)
+
+    return Abm[()], Qv[()], zeta[()], Fl_remain[()]
+
+def geometry_sweep(Dop, Z, Su, gamma_bulk, rate, Su_passive):
+    """
+    Evaluates Abm, Qv, zeta and Fl_remain over arrays of pipe/soil parameters
+    (NumPy broadcasting rules), e.g. for embedment or shear strength sensitivity studies.
+    """
+    Sub_wt = np.asarray(gamma_bulk, dtype=np.float64) - 10.05
+    Abm, Qv, zeta, Fl_remain = _geometry_kernel(Dop, Z, Su, Sub_wt, rate, Su_passive)
+    return {"Abm": Abm, "Qv": Qv, "zeta": zeta, "Fl_remain": Fl_remain}
+
+def _psi_kernel(Dop, tp, Z, Su, OCR, St, alpha, rate, gamma_bulk, Su_passive, ssr_arr, prem_arr):
+    """
+    Numeric core of the surface-laid analysis (plain floats and float64 arrays only).
+    ssr_arr / prem_arr are (n_surfaces, 3) arrays: rows follow SURFACES, columns P5 / P50 / P95.
+    The returned profile array is (n_surfaces, 3, 8) with [Abrk, Xb, Ares, Xr, Lbrk, Yb, Lres, Yr] on the last axis.
     """
-    # [cite_start]--- 1. EXTRACT INPUTS [cite: 57] ---
-    Dop = inputs['Dop']
-    tp = inputs['tp']
-    Z = inputs['Z']
-    Su = inputs['Su']
-    OCR = inputs['OCR']
-    St = inputs['St']
-    alpha = inputs['alpha']
-    rate = inputs['rate']
-    
     # [cite_start]Soil Weight correction (Bulk - 10.05 for Submerged) [cite: 58]
-    Sub_wt = inputs['gamma_bulk'] - 10.05 
-    Su_passive = inputs['Su_passive'] 
+    Sub_wt = gamma_bulk - 10.05
 
     # [cite_start]--- 2. WEIGHT CALCULATIONS [cite: 58] ---
-    Dip = Dop - 2 * tp
-    g = 9.8
-    Klay = 2.0
-    
     # [cite_start]Constants: 7850 (Steel), 1000 (Fluid), 1025 (Seawater) [cite: 58, 59]
-    Wp = (np.pi * (Dop**2 - Dip**2) * 7850) / 4
-    Wcon = (np.pi * Dip**2 * 1000) / 4
-    Wb = (np.pi * Dop**2 * 1025) / 4
-    
     # [cite_start]Flooded weight (Wpf) and Installation weight (Wpins) [cite: 59]
-    Wpf = ((Wp + Wcon - Wb) * g) / 1000.0
-    Wpins = (np.pi * (Dop**2 - Dip**2) * (7850 - 1025)) / 4
-    
+    _, _, Wp, Wpf, Wpins = pipe_weights(Dop, tp)
+    Klay = 2.0
+
     # [cite_start]Effective Vertical Force V [cite: 59]
-    V = max((Wpins * Klay * g / 1000.0), Wpf)
-
-    # [cite_start]--- 3. GEOMETRY & VERTICAL RESISTANCE (Qv) [cite: 60, 61] ---
-    # Logic for Penetrated Area (Abm)
-    if Z < Dop / 2:
-        val = Dop * Z - Z**2
-        B = 2 * np.sqrt(val) if val > 0 else 0
-        if Dop > 0:
-            asin_val = np.arcsin(B / Dop) if abs(B/Dop) <= 1 else 0
-            Abm = (asin_val * (Dop**2 / 4)) - (B * (Dop / 4) * np.cos(asin_val))
-        else:
-            Abm = 0
-    else:
-        B = Dop
-        Abm = (np.pi * Dop**2 / 8) + Dop * (Z - Dop / 2)
-        
-    # [cite_start]Vertical Bearing Capacity Qv [cite: 61, 62]
-    if Dop > 0:
-        term1 = 6 * (Z / Dop)**0.25
-        term2 = 3.4 * (10 * Z / Dop)**0.5
-        Qv = (min(term1, term2) + (1.5 * Sub_wt * Abm / (Dop * Su))) * Dop * Su
-    else:
-        Qv = 0
-
-    # [cite_start]--- 4. WEDGING & LATERAL RESISTANCE [cite: 62, 63] ---
-    # Wedging Factor (zeta)
-    cosVal = 1 - Z / (Dop / 2)
-    cosVal = max(-1.0, min(1.0, cosVal)) # Safety clamp
-    beta = np.arccos(cosVal)
-    
-    denom = beta + np.sin(beta) * np.cos(beta)
-    zeta = (2 * np.sin(beta)) / denom if denom != 0 else 1.0
-    
-    # [cite_start]Lateral Remaining Resistance (Passive Soil) [cite: 63]
-    Fl_remain = Z * rate * (2 * Su_passive + 0.5 * Sub_wt * Z)
+    V = max(Wpins * Klay, Wpf)
+
+    # [cite_start]--- 3./4. GEOMETRY, VERTICAL, WEDGING & LATERAL RESISTANCE [cite: 60, 61, 62, 63] ---
+    Abm, Qv, zeta, Fl_remain = _geometry_kernel(Dop, Z, Su, Sub_wt, rate, Su_passive)
+
+    # [cite_start]--- 6. CALCULATE RESISTANCE PROFILES [cite: 64] ---
+    # Force arrays are (n_surfaces, 3): one row per surface, one column per estimate
+    # Friction term shared by axial and lateral breakout
+    ocr_pow = np.power(OCR, prem_arr)
+    friction = alpha * ssr_arr * ocr_pow * rate * V
+
+    # [cite_start]Axial Breakout [cite: 66]
+    Abrk = friction * zeta
+
+    # [cite_start]Axial Residual [cite: 66]
+    Ares = (1.0 / St) * Abrk
+
+    # [cite_start]Lateral Breakout (Friction + Passive) [cite: 67]
+    Lbrk = friction + Fl_remain
+
+    # [cite_start]Lateral Residual [cite: 67]
+    zd = Z / Dop
+    Lres_raw = (0.32 + 0.8 * zd**0.8) * V if Dop > 0 else 0
+
+    # [cite_start]Apply safety factors to Residual (P5 / P50 / P95) [cite: 68, 69]
+    Lres = np.broadcast_to(Lres_raw * LRES_MULT, Abrk.shape)
+
+    # [cite_start]Displacements Calculation [cite: 69, 70, 71, 72]
+    # Displacements depend only on the estimate, so they are shared by every surface
+    Dop_mm = Dop * 1000.0
+    Xb = np.where(CAP_IS_FLOOR, np.maximum(XB_CAP, XB_COEF * Dop_mm), np.minimum(XB_CAP, XB_COEF * Dop_mm))
+    Xr = np.where(CAP_IS_FLOOR, np.maximum(XR_CAP, XR_COEF * Dop_mm), np.minimum(XR_CAP, XR_COEF * Dop_mm))
+    Yb = (YB_BASE + YB_SLOPE * zd) * Dop_mm
+    Yr = YR_COEF * Dop_mm
+
+    columns = [Abrk, Xb, Ares, Xr, Lbrk, Yb, Lres, Yr]
+    profile_arr = np.stack([np.broadcast_to(c, Abrk.shape) for c in columns], axis=-1)
+
+    return Wp, Wpf, V, Abm, Qv, zeta, Fl_remain, profile_arr
+
+def run_psi_analysis(inputs):
+    """
+    Performs Undrained Pipe-Soil Interaction analysis.
+    Calculates Axial and Lateral resistance profiles for given soil and pipe parameters.
+    """
+    # [cite_start]--- 1. EXTRACT INPUTS [cite: 57] ---
+    # [cite_start]Retrieve SSR/Prem inputs dynamically [cite: 65]
+    ssr_arr = np.asarray([[inputs[f"{s}_{e}_SSR"] for e in ESTIMATES] for s in SURFACES], dtype=np.float64)
+    prem_arr = np.asarray([[inputs[f"{s}_{e}_Prem"] for e in ESTIMATES] for s in SURFACES], dtype=np.float64)
+
+    Wp, Wpf, V, Abm, Qv, zeta, Fl_remain, profile_arr = _psi_kernel(
+        inputs['Dop'], inputs['tp'], inputs['Z'], inputs['Su'], inputs['OCR'], inputs['St'],
+        inputs['alpha'], inputs['rate'], inputs['gamma_bulk'], inputs['Su_passive'],
+        ssr_arr, prem_arr
+    )
 
     # [cite_start]--- 5. PREPARE RESULTS [cite: 63, 64] ---
     results = {
         "metrics": {
-            "Wp": Wp, "Wpf": Wpf, "V": V, 
-            "Abm": Abm, "Qv": Qv, "zeta": zeta, 
+            "Wp": Wp, "Wpf": Wpf, "V": V,
+            "Abm": Abm, "Qv": Qv, "zeta": zeta,
             "Fl_remain": Fl_remain, "Check_V_Qv": (V < Qv)
         },
         "profiles": []
     }
 
-    # [cite_start]--- 6. CALCULATE RESISTANCE PROFILES [cite: 64] ---
-    surfaces = ["Concrete", "PET"]
-    estimates = ["P5", "P50", "P95"]
-    
-    for surf_name in surfaces:
-        for est in estimates:
-            # [cite_start]Retrieve SSR/Prem inputs dynamically [cite: 65]
-            key_ssr = f"{surf_name}_{est}_SSR"
-            key_prem = f"{surf_name}_{est}_Prem"
-            
-            SSR = inputs[key_ssr]
-            Prem = inputs[key_prem]
-            
-            # [cite_start]Axial Breakout [cite: 66]
-            Abrk = alpha * SSR * (OCR**Prem) * zeta * rate * V
-            
-            # [cite_start]Axial Residual [cite: 66]
-            Ares = (1.0 / St) * Abrk
-            
-            # [cite_start]Lateral Breakout (Friction + Passive) [cite: 67]
-            Lbrk = (alpha * SSR * (OCR**Prem) * rate * V) + Fl_remain
-            
-            # [cite_start]Lateral Residual [cite: 67]
-            Lres_raw = (0.32 + 0.8 * (Z / Dop)**0.8) * V if Dop > 0 else 0
-            
-            # [cite_start]Apply safety factors to Residual [cite: 68, 69]
-            if est == "P5":
-                Lres = Lres_raw / 1.5
-            elif est == "P95":
-                Lres = Lres_raw * 1.5
-            else:
-                Lres = Lres_raw
-                
-            # [cite_start]Displacements Calculation [cite: 69, 70, 71, 72]
-            Dop_mm = Dop * 1000.0
-            
-            if est == "P5":
-                Xb = min(1.25, 0.0025 * Dop_mm)
-                Xr = min(7.5, 0.015 * Dop_mm)
-                Yb = (0.004 + 0.02 * (Z/Dop)) * Dop_mm
-                Yr = 0.6 * Dop_mm
-            elif est == "P50":
-                Xb = min(5.0, 0.01 * Dop_mm)
-                Xr = min(30.0, 0.06 * Dop_mm)
-                Yb = (0.02 + 0.25 * (Z/Dop)) * Dop_mm
-                Yr = 1.5 * Dop_mm
-            else: # P95
-                Xb = max(50.0, 0.01 * Dop_mm)
-                Xr = max(250.0, 0.5 * Dop_mm)
-                Yb = (0.1 + 0.7 * (Z/Dop)) * Dop_mm
-                Yr = 2.8 * Dop_mm
-                
-            # [cite_start]Append to results list [cite: 73]
-            results["profiles"].append({
-                "Surface": surf_name,
-                "Estimate": est,
-                "Axial": {"BreakForce": Abrk, "BreakDisp": Xb, "ResForce": Ares, "ResDisp": Xr},
-                "Lateral": {"BreakForce": Lbrk, "BreakDisp": Yb, "ResForce": Lres, "ResDisp": Yr}
-            })
-            
+    # [cite_start]Append to results list [cite: 73]
+    labels = [(s, e) for s in SURFACES for e in ESTIMATES]
+    for (surf_name, est), (Abrk, Xb, Ares, Xr, Lbrk, Yb, Lres, Yr) in zip(labels, profile_arr.reshape(-1, 8).tolist()):
+        results["profiles"].append({
+            "Surface": surf_name,
+            "Estimate": est,
+            "Axial": {"BreakForce": Abrk, "BreakDisp": Xb, "ResForce": Ares, "ResDisp": Xr},
+            "Lateral": {"BreakForce": Lbrk, "BreakDisp": Yb, "ResForce": Lres, "ResDisp": Yr}
+        })
+
     return results
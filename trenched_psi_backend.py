@@ -1,7 +1,52 @@
-import math
+from math import pi
+
+import numpy as np
 import pandas as pd
 
+from psi_core import pipe_weights
+
+def _trenched_kernel(dop, h, ap, nc, alpha, g_bulk, s_bnb, s_bo, s_ba):
+    """
+    Numeric core of the trenched analysis over float64 arrays
+    (one element per estimate case), evaluated as whole-array operations.
+
+    Returns:
+        tuple: (axial_gov, uplift_gov) arrays in kN/m
+    """
+    # Calculate submerged unit weight
+    g_sub = g_bulk - 10.05
+
+    # --- Axial Resistance ---
+    fa_deep = alpha * s_bnb * pi * dop
+    fa_shallow = alpha * s_bo * (pi * dop / 2) + 2 * s_ba * (h + dop / 2)
+    axial_gov = np.minimum(fa_deep, fa_shallow)
+
+    # --- Uplift Resistance ---
+    # FU_local calculation
+    fu_local = (nc * s_bnb * dop) - (g_sub * ap)
+
+    # FU_global calculation
+    term1 = g_sub * h * dop
+    term2 = g_sub * (dop**2) * (0.5 - pi / 8)
+    term3 = 2 * s_bnb * (h + dop / 2)
+    fu_global = term1 + term2 + term3
+
+    uplift_gov = np.minimum(fu_local, fu_global)
+
+    return axial_gov, uplift_gov
+
 class Trenched_PSI_Backend:
+    # Only the pipe/trench inputs are stored per instance
+    __slots__ = ('dop', 'tp', 'h')
+
+    # Constants (shared by all instances)
+    g_steel = 7850
+    g_fluid = 1000
+    g_sw = 1025
+    g_acc = 9.8
+    klay = 2.0
+    nc = 9.0
+
     def __init__(self, dop, tp, h):
         """
         Initializes the model with constant physical inputs for the pipe and trench.
@@ -15,37 +60,9 @@ class Trenched_PSI_Backend:
         self.tp = tp
         self.h = h
 
-        # Constants
-        self.pi = math.pi
-        self.g_steel = 7850
-        self.g_fluid = 1000
-        self.g_sw = 1025
-        self.g_acc = 9.8
-        self.klay = 2.0
-        self.nc = 9.0
-
     def calculate_weights(self):
         """Calculates pipe weights and effective vertical force (V)."""
-        dip = self.dop - (2 * self.tp)
-        
-        # Area (used in uplift later, but calculated here in VBA context)
-        ap = (self.pi * self.dop**2) / 4
-        
-        # Weight Calculations
-        # Wp: Steel weight
-        wp = (self.pi * (self.dop**2 - dip**2) * self.g_steel) / 4
-        
-        # Wcon: Fluid content weight
-        wcon = (self.pi * (dip**2) * self.g_fluid) / 4
-        
-        # Wb: Buoyancy
-        wb = (self.pi * (self.dop**2) * self.g_sw) / 4
-        
-        # Wpf: Flooded weight in kN/m
-        wpf = ((wp + wcon - wb) * self.g_acc) / 1000
-        
-        # Wpins: Installation weight (Steel - Seawater)
-        wpins = ((self.pi * (self.dop**2 - dip**2) * (self.g_steel - self.g_sw)) / 4) * self.g_acc / 1000
+        dip, ap, _, wpf, wpins = pipe_weights(self.dop, self.tp, self.g_steel, self.g_fluid, self.g_sw, self.g_acc)
         
         # V: Effective Vertical Force
         v = max(wpins * self.klay, wpf)
@@ -69,43 +86,18 @@ class Trenched_PSI_Backend:
         v = weights["V"]
         ap = weights["Ap"]
         
-        results = []
         estimates = ["P5 (Low)", "P50 (Best)", "P95 (High)"]
-        
-        # We loop 0 to 2 for the three estimate cases
-        for i in range(3):
-            # Extract inputs for this iteration
-            alpha = soil_inputs['alpha'][i]
-            g_bulk = soil_inputs['g_bulk'][i]
-            
-            # Calculate submerged unit weight
-            g_sub = g_bulk - 10.05
-            
-            s_bnb = soil_inputs['s_bnb'][i]
-            s_bo = soil_inputs['s_bo'][i]
-            s_ba = soil_inputs['s_ba'][i]
-            
-            # --- Axial Resistance ---
-            fa_deep = alpha * s_bnb * self.pi * self.dop
-            fa_shallow = alpha * s_bo * (self.pi * self.dop / 2) + 2 * s_ba * (self.h + self.dop / 2)
-            axial_gov = min(fa_deep, fa_shallow)
-            
-            # --- Uplift Resistance ---
-            # FU_local calculation
-            fu_local = (self.nc * s_bnb * self.dop) - (g_sub * ap)
-            
-            # FU_global calculation
-            term1 = g_sub * self.h * self.dop
-            term2 = g_sub * (self.dop**2) * (0.5 - self.pi / 8)
-            term3 = 2 * s_bnb * (self.h + self.dop / 2)
-            fu_global = term1 + term2 + term3
-            
-            uplift_gov = min(fu_local, fu_global)
-            
-            results.append({
-                "Category": estimates[i],
-                "Axial Resistance (kN/m)": round(axial_gov, 2),
-                "Uplift Resistance (kN/m)": round(uplift_gov, 2)
-            })
-            
-        return v, pd.DataFrame(results)
+
+        # Each key maps to [val_p5, val_p50, val_p95]
+        arrays = {k: np.asarray(soil_inputs[k], dtype=np.float64)
+                  for k in ('alpha', 'g_bulk', 's_bnb', 's_bo', 's_ba')}
+        axial_gov, uplift_gov = _trenched_kernel(self.dop, self.h, ap, self.nc, **arrays)
+
+        # Build the frame column-wise from the kernel output (no per-row dict inference)
+        # and round all numeric columns for display in one pass
+        df = pd.DataFrame({
+            "Category": estimates,
+            "Axial Resistance (kN/m)": axial_gov,
+            "Uplift Resistance (kN/m)": uplift_gov
+        })
+        return v, df.round(2)